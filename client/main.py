@@ -5,31 +5,118 @@ Intelligent client that implements Ricart-Agrawala mutual exclusion algorithm.
 Acts as both gRPC server (for MutualExclusionService) and gRPC client (for printer and peers).
 """
 
-import argparse
+import heapq
 import threading
-import time
 import random
 from typing import List, Dict, Set, Optional, Tuple
 from dataclasses import dataclass
-from collections import deque
 import grpc
 from concurrent import futures
-import printing_pb2
-import printing_pb2_grpc
+# common is imported before printing_pb2 so it can select the protobuf backend
+from common.grpc_options import CHANNEL_OPTIONS, SERVER_OPTIONS
 from common.lamport_clock import LamportClock
-from common.logger import create_client_logger
+from common.logger import (
+    DEBUG,
+    INFO,
+    LAMPORT_CTX,
+    LEVEL_NAMES,
+    create_client_logger,
+    enable_async_output,
+)
 from common.message_builder import MessageBuilder
+from google.protobuf.internal import api_implementation
+import printing_pb2
+import printing_pb2_grpc
+
+# Mutual-exclusion messages are built inline on the hot paths (one per peer
+# and per reply); MessageBuilder stays for the cold call sites
+_AccessRequest = printing_pb2.AccessRequest
+_AccessResponse = printing_pb2.AccessResponse
+_AccessRelease = printing_pb2.AccessRelease
+
+# RequestAccess is broadcast with identical content to every peer, so it is
+# serialized once and sent as raw bytes through this method
+_REQUEST_ACCESS_METHOD = '/distributed_printing.MutualExclusionService/RequestAccess'
+
+# Deadline (seconds) for a peer's AccessResponse. A deferred reply only arrives
+# once the peer leaves its critical section (print delay plus retries); calls
+# also wait within it for peers that are not up yet
+ACCESS_REPLY_TIMEOUT = 60.0
+
+
+# Reason codes returned by ClientNode._evaluate_access_request
+DEFER_IN_CS = 0
+GRANT_LOWER_TIMESTAMP = 1
+DEFER_HIGHER_TIMESTAMP = 2
+GRANT_TIE_LOWER_ID = 3
+DEFER_TIE_HIGHER_ID = 4
+GRANT_IDLE = 5
 
+# Log templates indexed by reason code, formatted only when the log line is emitted
+_REASONS = (
+    "AccessRequest de cliente %d DEFERIDO (em CS, TS: %d)",
+    "AccessRequest de cliente %d CONCEDIDO (TS %d < nosso TS %d)",
+    "AccessRequest de cliente %d DEFERIDO (TS %d > nosso TS %d)",
+    "AccessRequest de cliente %d CONCEDIDO (TS igual, ID %d < nosso ID %d)",
+    "AccessRequest de cliente %d DEFERIDO (TS igual, ID %d >= nosso ID %d)",
+    "AccessRequest de cliente %d CONCEDIDO (não em CS)",
+)
 
-@dataclass
+# Process-wide channel cache: one channel per address, shared by every ClientNode
+# and closed when its last user releases it
+_CHANNEL_CACHE: Dict[str, grpc.Channel] = {}
+_CHANNEL_REFCOUNTS: Dict[str, int] = {}
+_CHANNEL_CACHE_LOCK = threading.Lock()
+
+
+def get_channel(address: str) -> grpc.Channel:
+    """
+    Get the shared gRPC channel for an address, creating it on first use.
+    
+    Each call must be paired with a release_channel() call.
+    
+    Args:
+        address: Target address (e.g., "localhost:50053")
+        
+    Returns:
+        Channel configured with CHANNEL_OPTIONS
+    """
+    with _CHANNEL_CACHE_LOCK:
+        channel = _CHANNEL_CACHE.get(address)
+        if channel is None:
+            channel = grpc.insecure_channel(address, options=CHANNEL_OPTIONS)
+            _CHANNEL_CACHE[address] = channel
+        _CHANNEL_REFCOUNTS[address] = _CHANNEL_REFCOUNTS.get(address, 0) + 1
+        return channel
+
+
+def release_channel(address: str):
+    """
+    Release a channel obtained with get_channel(), closing it if unused.
+    
+    Args:
+        address: Target address passed to get_channel()
+    """
+    with _CHANNEL_CACHE_LOCK:
+        remaining = _CHANNEL_REFCOUNTS.get(address, 0) - 1
+        if remaining > 0:
+            _CHANNEL_REFCOUNTS[address] = remaining
+            return
+        _CHANNEL_REFCOUNTS.pop(address, None)
+        channel = _CHANNEL_CACHE.pop(address, None)
+    
+    if channel is not None:
+        channel.close()
+
+
+@dataclass(order=True)
 class PendingRequest:
-    """Represents a pending access request."""
-    client_id: int
+    """Represents a pending access request, ordered by (timestamp, client ID)."""
     lamport_timestamp: int
+    client_id: int
     request_number: int
 
 
-@dataclass
 class MutualExclusionServiceServicer(printing_pb2_grpc.MutualExclusionServiceServicer):
     """
     Implementation of MutualExclusionService for receiving requests from peers.
@@ -56,7 +143,8 @@ class MutualExclusionServiceServicer(printing_pb2_grpc.MutualExclusionServiceSer
         
         Algorithm decision logic:
         1. If not in CS and not waiting for CS -> reply immediately (grant access)
-        2. If in CS -> defer reply (add to deferred_replies)
+        2. If in CS -> defer reply (add to deferred_replies and block until
+           release_access answers it)
         3. If waiting for CS:
            - Compare timestamps: if incoming TS < own TS, reply immediately
            - If incoming TS > own TS, defer reply
@@ -71,38 +159,53 @@ class MutualExclusionServiceServicer(printing_pb2_grpc.MutualExclusionServiceSer
         """
         client_node = self.client_node
         
-        # Update clock with received timestamp (Lamport rule: on receive)
-        response_timestamp = client_node.clock.receive_event(request.lamport_timestamp)
-        
         with client_node.lock:
-            should_defer, log_message = client_node._evaluate_access_request(request)
+            # Update clock with received timestamp (Lamport rule: on receive).
+            # Done under the node lock so the decision below sees a consistent
+            # clock and request queue
+            response_timestamp = client_node.clock.receive_event(request.lamport_timestamp)
+            token = LAMPORT_CTX.set(response_timestamp)
+            try:
+                should_defer, reason, reason_args = client_node._evaluate_access_request(request)
+                log_enabled = client_node.logger.is_enabled_for(INFO)
+
+                if should_defer:
+                    # Only add to deferred_replies if not already there
+                    if request.client_id not in client_node.deferred_replies:
+                        client_node.deferred_replies[request.client_id] = request
+                        if log_enabled:
+                            client_node.logger.info(_REASONS[reason] % reason_args)
 
-            if should_defer:
-                # Only add to deferred_replies if not already there
-                if request.client_id not in client_node.deferred_replies:
-                    client_node.deferred_replies[request.client_id] = request
+                    # The deferred reply is this response: hold it until
+                    # release_access answers the deferred requests (or the
+                    # node stops, so the server's worker threads can exit)
+                    while (request.client_id in client_node.deferred_replies
+                           and not client_node._shutdown_event.is_set()):
+                        client_node.defer_condition.wait()
+
+                    response_timestamp = client_node.clock.tick()
+                    LAMPORT_CTX.set(response_timestamp)
                     client_node.logger.info(
-                        log_message,
-                        lamport_timestamp=response_timestamp
+                        f"Enviando resposta adiada para cliente {request.client_id}"
+                    )
+                    return _AccessResponse(
+                        access_granted=True,
+                        lamport_timestamp=response_timestamp,
                     )
-                
-                # Return negative response when deferring
-                return MessageBuilder.build_access_response(
-                    access_granted=False,
-                    lamport_timestamp=client_node.clock.tick()
-                )
 
-            # Grant access immediately
-            client_node.logger.info(
-                log_message,
-                lamport_timestamp=client_node.clock.get_time()
-            )
-            
-            response_timestamp = client_node.clock.tick()
-            return MessageBuilder.build_access_response(
-                access_granted=True,
-                lamport_timestamp=response_timestamp,
-            )
+                # Grant access immediately. The receive merge already advanced the
+                # clock past the request, so it also stamps the reply (no extra tick)
+                if log_enabled:
+                    client_node.logger.info(_REASONS[reason] % reason_args)
+
+                return _AccessResponse(
+                    access_granted=True,
+                    lamport_timestamp=response_timestamp,
+                )
+            finally:
+                # Do not leak this RPC's timestamp into later log lines of
+                # the thread
+                LAMPORT_CTX.reset(token)
     
     def ReleaseAccess(self, request: printing_pb2.AccessRelease, context):
         """
@@ -122,16 +225,16 @@ class MutualExclusionServiceServicer(printing_pb2_grpc.MutualExclusionServiceSer
         client_node = self.client_node
         
         # Update clock with received timestamp
-        timestamp = client_node.clock.receive_event(request.lamport_timestamp)
-        
-        client_node.logger.info(
-            f"AccessRelease recebido de cliente {request.client_id} (TS: {request.lamport_timestamp})",
-            lamport_timestamp=timestamp
-        )
+        token = LAMPORT_CTX.set(client_node.clock.receive_event(request.lamport_timestamp))
+        try:
+            client_node.logger.info(
+                f"AccessRelease recebido de cliente {request.client_id} (TS: {request.lamport_timestamp})"
+            )
+        finally:
+            LAMPORT_CTX.reset(token)
         
-        # Note: The actual processing of deferred replies happens when we receive
-        # the release while waiting. The peer who released will have already
-        # sent replies to all deferred requests when they exited CS.
+        # Note: Deferred replies are the blocked RequestAccess responses of the
+        # peer that released, so they have already been answered when it exited CS.
         # This method just acknowledges receipt.
         
         return MessageBuilder.build_empty()
@@ -154,6 +257,7 @@ class ClientNode:
         peer_addresses: List[str],
         job_interval_min: float = 5.0,
         job_interval_max: float = 10.0,
+        log_level: int = DEBUG,
     ):
         """
         Initialize client node.
@@ -165,6 +269,7 @@ class ClientNode:
             peer_addresses: List of peer client addresses (e.g., ["localhost:50053", "localhost:50054"])
             job_interval_min: Minimum interval between print jobs in seconds (default: 5.0)
             job_interval_max: Maximum interval between print jobs in seconds (default: 10.0)
+            log_level: Minimum log level emitted (default: DEBUG)
         """
         self.client_id = client_id
         self.port = port
@@ -176,11 +281,11 @@ class ClientNode:
         
         # Utilities
         self.clock = LamportClock()
-        self.logger = create_client_logger(client_id)
+        self.logger = create_client_logger(client_id, self.clock, log_level)
         
         # Internal state
         self.request_number = 0  # Sequence number for requests
-        self.request_queue: deque = deque()  # Queue of pending requests
+        self.request_queue: List[PendingRequest] = []  # Min-heap of pending requests
 
         # State tracking
         self.has_access = False  # Whether we currently have access to the resource
@@ -189,70 +294,92 @@ class ClientNode:
         self.received_replies: Set[str] = set()  # Track which peers have replied
         self.outstanding_replies: Set[str] = set()  # Peers dos quais aguardamos resposta
         
-        # Threading (must be initialized before access_condition)
+        # Threading (lock must be initialized before defer_condition)
         self.lock = threading.Lock()
         self.running = False
-        self.access_condition = threading.Condition(self.lock)  # Condition variable for waiting for access
+        self._shutdown_event = threading.Event()  # Wakes background loops on stop()
         self.defer_condition = threading.Condition(self.lock)  # Condition variable for deferred replies
+        # Reused threads for the AccessRelease fan-out (threads are only
+        # spawned on demand)
+        self._executor = futures.ThreadPoolExecutor(
+            max_workers=max(16, len(peer_addresses)),
+            thread_name_prefix=f"client-{client_id}",
+        )
 
         # gRPC components
         self.grpc_server = None
         self.printer_stub = None
         self.peer_stubs: Dict[str, printing_pb2_grpc.MutualExclusionServiceStub] = {}
+        # (address, stub) pairs resolved once for the per-broadcast loops
+        self._peer_stub_pairs: Tuple[
+            Tuple[str, printing_pb2_grpc.MutualExclusionServiceStub], ...
+        ] = ()
+        # (address, RequestAccess callable taking pre-serialized bytes) pairs
+        self._peer_request_access: Tuple[Tuple[str, grpc.UnaryUnaryMultiCallable], ...] = ()
+        self._channel_addresses: List[str] = []  # Channels to release on stop()
 
-    def _evaluate_access_request(self, request: printing_pb2.AccessRequest) -> Tuple[bool, str]:
-        """Evaluate whether an incoming request should be deferred or granted."""
+    def _evaluate_access_request(
+        self, request: printing_pb2.AccessRequest
+    ) -> Tuple[bool, int, tuple]:
+        """
+        Evaluate whether an incoming request should be deferred or granted.
+        
+        Args:
+            request: AccessRequest from peer
+            
+        Returns:
+            Tuple (should_defer, reason_code, context) where the log message is
+            _REASONS[reason_code] % context
+        """
+
+        if not self.has_access and not self.waiting_for_access:
+            # Common case: idle node -> grant immediately
+            return False, GRANT_IDLE, (request.client_id,)
 
         if self.has_access:
             # Always defer if we're in critical section
-            return True, (
-                f"AccessRequest de cliente {request.client_id} DEFERIDO (em CS, TS: {request.lamport_timestamp})"
-            )
+            return True, DEFER_IN_CS, (request.client_id, request.lamport_timestamp)
 
-        if self.waiting_for_access and self.request_queue:
-            # Make sure request queue is sorted
-            self.request_queue = deque(sorted(
-                self.request_queue,
-                key=lambda x: (x.lamport_timestamp, x.client_id)
-            ))
-            
-            our_request = self.request_queue[0]
-            our_timestamp = our_request.lamport_timestamp
+        if self.request_queue:
+            # Heap head is our oldest pending request
+            our_timestamp = self.request_queue[0].lamport_timestamp
 
             # Compare timestamps first
             if request.lamport_timestamp < our_timestamp:
-                return False, (
-                    f"AccessRequest de cliente {request.client_id} CONCEDIDO "
-                    f"(TS {request.lamport_timestamp} < nosso TS {our_timestamp})"
+                return False, GRANT_LOWER_TIMESTAMP, (
+                    request.client_id, request.lamport_timestamp, our_timestamp
                 )
 
             if request.lamport_timestamp > our_timestamp:
-                return True, (
-                    f"AccessRequest de cliente {request.client_id} DEFERIDO "
-                    f"(TS {request.lamport_timestamp} > nosso TS {our_timestamp})"
+                return True, DEFER_HIGHER_TIMESTAMP, (
+                    request.client_id, request.lamport_timestamp, our_timestamp
                 )
 
             # Break timestamp ties with client IDs
             if request.client_id < self.client_id:
-                return False, (
-                    f"AccessRequest de cliente {request.client_id} CONCEDIDO "
-                    f"(TS igual, ID {request.client_id} < nosso ID {self.client_id})"
+                return False, GRANT_TIE_LOWER_ID, (
+                    request.client_id, request.client_id, self.client_id
                 )
 
-            return True, (
-                f"AccessRequest de cliente {request.client_id} DEFERIDO "
-                f"(TS igual, ID {request.client_id} >= nosso ID {self.client_id})"
+            return True, DEFER_TIE_HIGHER_ID, (
+                request.client_id, request.client_id, self.client_id
             )
 
-        # Not in CS and not waiting -> grant immediately
-        return False, (
-            f"AccessRequest de cliente {request.client_id} CONCEDIDO (não em CS)"
-        )
+        # Waiting flag set but no queued request -> treat as idle
+        return False, GRANT_IDLE, (request.client_id,)
     
     def initialize_grpc(self):
         """Initialize gRPC server and client stubs."""
-        # Create gRPC server
-        self.grpc_server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+        # Create gRPC server. Deferred RequestAccess calls hold a worker until we
+        # release, so the pool must cover every peer plus room for releases
+        workers = max(2 * len(self.peer_addresses) + 4, 16)
+        self.grpc_server = grpc.server(
+            futures.ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix=f"srv-{self.client_id}",
+            ),
+            options=SERVER_OPTIONS,
+        )
         
         # Add MutualExclusionService servicer
         servicer = MutualExclusionServiceServicer(self)
@@ -263,13 +390,23 @@ class ClientNode:
         self.grpc_server.add_insecure_port(listen_addr)
         
         # Create printer client stub
-        printer_channel = grpc.insecure_channel(self.printer_server)
+        printer_channel = get_channel(self.printer_server)
+        self._channel_addresses.append(self.printer_server)
         self.printer_stub = printing_pb2_grpc.PrintingServiceStub(printer_channel)
         
         # Create peer client stubs
+        request_access = []
         for peer_addr in self.peer_addresses:
-            peer_channel = grpc.insecure_channel(peer_addr)
+            peer_channel = get_channel(peer_addr)
+            self._channel_addresses.append(peer_addr)
             self.peer_stubs[peer_addr] = printing_pb2_grpc.MutualExclusionServiceStub(peer_channel)
+            # No request serializer: the broadcast passes the encoded bytes through
+            request_access.append((peer_addr, peer_channel.unary_unary(
+                _REQUEST_ACCESS_METHOD,
+                response_deserializer=_AccessResponse.FromString,
+            )))
+        self._peer_stub_pairs = tuple(self.peer_stubs.items())
+        self._peer_request_access = tuple(request_access)
         
         self.logger.info(f"gRPC inicializado - Servidor na porta {self.port}")
         self.logger.info(f"Conectado ao servidor de impressão: {self.printer_server}")
@@ -285,6 +422,7 @@ class ClientNode:
             f"Cliente {self.client_id} iniciado na porta {self.port}",
             lamport_timestamp=self.clock.get_time()
         )
+        self.logger.info(f"Backend protobuf: {api_implementation.Type()}")
         
         # Start status reporting thread
         status_thread = threading.Thread(target=self._status_reporter, daemon=True)
@@ -298,19 +436,30 @@ class ClientNode:
             self.grpc_server.wait_for_termination()
         except KeyboardInterrupt:
             self.logger.info("Cliente sendo encerrado...")
+        finally:
+            # Always shut the release pool down (its threads are not daemons)
             self.stop()
     
     def stop(self):
         """Stop the client node."""
         self.running = False
+        self._shutdown_event.set()
+        # Release the RequestAccess handlers still holding deferred replies
+        with self.lock:
+            self.deferred_replies.clear()
+            self.defer_condition.notify_all()
         if self.grpc_server:
             self.grpc_server.stop(grace=5)
+        self._executor.shutdown(wait=False)
+        for address in self._channel_addresses:
+            release_channel(address)
+        self._channel_addresses.clear()
     
     def _status_reporter(self):
         """Periodically report client status."""
         while self.running:
-            time.sleep(5)  # Report every 5 seconds
-            if not self.running:
+            # Report every 5 seconds, waking immediately on stop()
+            if self._shutdown_event.wait(timeout=5) or not self.running:
                 break
             
             with self.lock:
@@ -327,7 +476,7 @@ class ClientNode:
                 lamport_timestamp=clock_time
             )
     
-    def request_print_access(self):
+    def request_print_access(self) -> bool:
         """
         Request access to print using Ricart-Agrawala algorithm.
         
@@ -340,6 +489,10 @@ class ClientNode:
         Reference: Ricart, Glenn, and Ashok K. Agrawala.
         "An optimal algorithm for mutual exclusion in computer networks."
         Communications of the ACM 24.1 (1981): 9-17.
+        
+        Returns:
+            True once access has been granted, False if a peer failed to reply
+            (error or ACCESS_REPLY_TIMEOUT elapsed)
         """
         with self.lock:
             self.request_number += 1
@@ -356,22 +509,24 @@ class ClientNode:
                 lamport_timestamp=timestamp,
                 request_number=self.request_number
             )
-            self.request_queue.append(pending)
+            heapq.heappush(self.request_queue, pending)
             self.waiting_for_access = True
             self.received_replies.clear()
             self.outstanding_replies = set(self.peer_addresses)
         
-        # Broadcast AccessRequest to all peers
-        self._broadcast_access_request(pending)
-        
-        # Wait for all replies
-        with self.access_condition:
-            while len(self.received_replies) < len(self.peer_addresses):
-                self.logger.info(
-                    f"Aguardando respostas ({len(self.received_replies)}/{len(self.peer_addresses)})",
-                    lamport_timestamp=self.clock.get_time()
-                )
-                self.access_condition.wait(timeout=1.0)
+        # Broadcast AccessRequest to all peers and wait once for every reply
+        pending_futures = self._broadcast_access_request(pending)
+        if pending_futures:
+            self.logger.info(
+                f"Aguardando respostas de {len(pending_futures)} peer(s)",
+                lamport_timestamp=timestamp
+            )
+        for index, (peer_addr, future) in enumerate(pending_futures):
+            if not self._on_access_reply(peer_addr, future):
+                for _, other in pending_futures[index + 1:]:
+                    other.cancel()
+                self._abandon_access_request(pending)
+                return False
         
         # All replies received - grant access
         with self.lock:
@@ -382,72 +537,104 @@ class ClientNode:
                 f"Acesso concedido! Todas as respostas recebidas.",
                 lamport_timestamp=self.clock.get_time()
             )
+        
+        return True
     
-    def _broadcast_access_request(self, pending_request: PendingRequest):
+    def _broadcast_access_request(
+        self, pending_request: PendingRequest
+    ) -> List[Tuple[str, grpc.Future]]:
         """
         Broadcast AccessRequest to all peer clients.
         
+        Uses gRPC's native asynchronous API, so no extra threads are needed.
+        The request is serialized once and the same bytes go to every peer.
+        
         Args:
             pending_request: The pending request to broadcast
+            
+        Returns:
+            List of (peer address, response future) pairs
         """
-        request = MessageBuilder.build_access_request(
+        payload = _AccessRequest(
             client_id=self.client_id,
             lamport_timestamp=pending_request.lamport_timestamp,
             request_number=pending_request.request_number,
-        )
+        ).SerializeToString()
         
-        # Send to all peers asynchronously
-        for peer_addr in self.peer_addresses:
-            threading.Thread(
-                target=self._send_access_request_to_peer,
-                args=(peer_addr, request),
-                daemon=True
-            ).start()
+        return [
+            (peer_addr, request_access.future(
+                payload, timeout=ACCESS_REPLY_TIMEOUT, wait_for_ready=True
+            ))
+            for peer_addr, request_access in self._peer_request_access
+        ]
     
-    def _send_access_request_to_peer(self, peer_addr: str, request: printing_pb2.AccessRequest):
+    def _on_access_reply(self, peer_addr: str, future: grpc.Future) -> bool:
         """
-        Send AccessRequest to a specific peer and handle response.
+        Wait for a peer's AccessResponse and record it.
         
         Args:
             peer_addr: Address of the peer
-            request: AccessRequest message
+            future: Future returned by the asynchronous RequestAccess call
+            
+        Returns:
+            True if the peer replied, False if the call failed or timed out
         """
         try:
-            stub = self.peer_stubs[peer_addr]
-            response = stub.RequestAccess(request)
+            response = future.result()
             
-            # Update clock with response timestamp
-            with self.lock:
-                self.clock.receive_event(response.lamport_timestamp)
+            # Update clock with response timestamp (the clock is atomic on its own)
+            reply_timestamp = self.clock.receive_event(response.lamport_timestamp)
             
             # Record that we received a reply
-            with self.access_condition:
+            with self.lock:
                 self.outstanding_replies.discard(peer_addr)
                 self.received_replies.add(peer_addr)
-                self.logger.info(
-                    f"Resposta recebida de {peer_addr} (granted: {response.access_granted})",
-                    lamport_timestamp=self.clock.get_time()
-                )
-                self.access_condition.notify_all()
+            
+            self.logger.info(
+                f"Resposta recebida de {peer_addr} (granted: {response.access_granted})",
+                lamport_timestamp=reply_timestamp
+            )
+            return True
         
         except grpc.RpcError as e:
             self.logger.error(
                 f"Erro ao enviar AccessRequest para {peer_addr}: {e.code()}",
                 lamport_timestamp=self.clock.get_time()
             )
-            # Still count as received to avoid deadlock (in real system, might retry)
-            with self.access_condition:
-                self.outstanding_replies.discard(peer_addr)
-                self.received_replies.add(peer_addr)
-                self.access_condition.notify_all()
+            return False
+    
+    def _abandon_access_request(self, pending: PendingRequest):
+        """
+        Withdraw a request that could not collect every reply.
+        
+        Requests deferred while we were waiting are answered, since we will
+        not enter the critical section.
+        
+        Args:
+            pending: The pending request to withdraw
+        """
+        with self.lock:
+            self.waiting_for_access = False
+            if pending in self.request_queue:
+                self.request_queue.remove(pending)
+                heapq.heapify(self.request_queue)
+            self.outstanding_replies.clear()
+            self.deferred_replies.clear()
+            self.defer_condition.notify_all()
+        
+        self.logger.error(
+            f"Requisição #{pending.request_number} abandonada - nem todos os peers responderam",
+            lamport_timestamp=self.clock.get_time()
+        )
     
     def release_access(self):
         """
         Release access and process deferred replies (Ricart-Agrawala algorithm).
         
         When exiting CS:
-        1. Broadcast ReleaseAccess to all deferred peers
-        2. Clear access state
+        1. Answer all deferred requests
+        2. Broadcast ReleaseAccess to all peers
+        3. Clear access state
         """
         with self.lock:
             if not self.has_access:
@@ -465,12 +652,13 @@ class ClientNode:
                 lamport_timestamp=timestamp
             )
             
-            # Process all deferred replies before releasing
-            deferred_requests = list(self.deferred_replies.values())
+            # Answer all deferred requests: their RequestAccess handlers are
+            # blocked on defer_condition and reply as soon as they wake up
             self.deferred_replies.clear()
+            self.defer_condition.notify_all()
 
             # Create release message
-            release_msg = MessageBuilder.build_access_release(
+            release_msg = _AccessRelease(
                 client_id=self.client_id,
                 lamport_timestamp=timestamp,
                 request_number=self.request_number,
@@ -480,63 +668,42 @@ class ClientNode:
             self.has_access = False
             
             # Remove our request from queue
-            if len(self.request_queue) > 0:
-                self.request_queue.popleft()
+            if self.request_queue:
+                heapq.heappop(self.request_queue)
             
-            # Send releases to all peers first
-            for peer_addr in self.peer_addresses:
-                threading.Thread(
-                    target=self._send_access_release_to_peer,
-                    args=(peer_addr, release_msg),
-                    daemon=True
-                ).start()
-
-            # Now process all deferred requests in order of timestamp
-            deferred_requests.sort(key=lambda x: (x.lamport_timestamp, x.client_id))
-            for peer_id, request in self.deferred_replies.items():
-                # Find the peer address based on client ID
-                peer_addr = None
-                for addr in self.peer_stubs:
-                    if f"cliente {peer_id}" in addr:  # matches format like "localhost:50052"
-                        peer_addr = addr
-                        break
-                
-                if not peer_addr:
-                    self.logger.error(
-                        f"Não foi possível encontrar o endereço do cliente {peer_id}",
-                        lamport_timestamp=self.clock.get_time()
-                    )
-                    continue
-
-                response = MessageBuilder.build_access_response(
-                    access_granted=True,
-                    lamport_timestamp=self.clock.tick()
-                )
-                try:
-                    self.peer_stubs[peer_addr].ReplyToAccessRequest(response)
-                    self.logger.info(
-                        f"Enviando resposta adiada para cliente {peer_id} em {peer_addr}",
-                        lamport_timestamp=self.clock.get_time()
-                    )
-                except grpc.RpcError as e:
-                    self.logger.error(
-                        f"Erro ao enviar resposta adiada para cliente {peer_id}: {e.code()}",
-                        lamport_timestamp=self.clock.get_time()
-                    )
-
             # Clear tracking state
             self.outstanding_replies.clear()
+        
+        # Send releases to all peers concurrently, outside the lock so incoming
+        # RequestAccess calls are not held up while they are dispatched
+        try:
+            for peer_addr, stub in self._peer_stub_pairs:
+                self._executor.submit(
+                    self._send_access_release_to_peer, peer_addr, stub, release_msg
+                )
+        except RuntimeError:
+            # stop() already shut the pool down (e.g. Ctrl+C during a job).
+            # Deferred peers were answered above; only the notification is lost
+            self.logger.warning(
+                "Cliente encerrando - AccessRelease não enviado aos peers",
+                lamport_timestamp=timestamp
+            )
     
-    def _send_access_release_to_peer(self, peer_addr: str, release: printing_pb2.AccessRelease):
+    def _send_access_release_to_peer(
+        self,
+        peer_addr: str,
+        stub: printing_pb2_grpc.MutualExclusionServiceStub,
+        release: printing_pb2.AccessRelease,
+    ):
         """
         Send AccessRelease to a specific peer.
         
         Args:
             peer_addr: Address of the peer
+            stub: MutualExclusionService stub for the peer
             release: AccessRelease message
         """
         try:
-            stub = self.peer_stubs[peer_addr]
             stub.ReleaseAccess(release)
             
             self.logger.info(
@@ -563,6 +730,7 @@ class ClientNode:
             max_retries: Maximum number of retry attempts (default: 3)
         """
         timestamp = self.clock.send_event()
+        ts = timestamp  # Latest clock value, reused for log lines
         
         request = MessageBuilder.build_print_request(
             client_id=self.client_id,
@@ -576,7 +744,7 @@ class ClientNode:
             try:
                 self.logger.info(
                     f"Enviando documento para impressão: {message_content}",
-                    lamport_timestamp=self.clock.get_time()
+                    lamport_timestamp=ts
                 )
                 
                 # Set timeout for RPC call (10 seconds)
@@ -586,18 +754,18 @@ class ClientNode:
                 )
                 
                 # Update clock with server's response timestamp
-                self.clock.receive_event(response.lamport_timestamp)
+                ts = self.clock.receive_event(response.lamport_timestamp)
                 
                 if response.success:
                     self.logger.info(
                         f"Impressão confirmada: {response.confirmation_message}",
-                        lamport_timestamp=self.clock.get_time()
+                        lamport_timestamp=ts
                     )
                     return True  # Success
                 else:
                     self.logger.error(
                         "Falha na impressão - servidor retornou sucesso=False",
-                        lamport_timestamp=self.clock.get_time()
+                        lamport_timestamp=ts
                     )
                     return False
                 
@@ -606,7 +774,7 @@ class ClientNode:
                 error_code = e.code()
                 
                 # Update clock for error event
-                self.clock.tick()
+                ts = self.clock.tick()
                 
                 if retry_count < max_retries:
                     # Retryable errors
@@ -615,35 +783,38 @@ class ClientNode:
                         self.logger.warning(
                             f"Erro ao comunicar com servidor ({error_code.name}), "
                             f"tentando novamente em {wait_time}s (tentativa {retry_count}/{max_retries})",
-                            lamport_timestamp=self.clock.get_time()
+                            lamport_timestamp=ts
                         )
-                        time.sleep(wait_time)
+                        # Back off, but give up at once if the node is stopped
+                        if self._shutdown_event.wait(timeout=wait_time):
+                            return False
                         continue
                     else:
                         # Non-retryable errors
                         self.logger.error(
                             f"Erro não recuperável ao comunicar com servidor: {error_code.name}",
-                            lamport_timestamp=self.clock.get_time()
+                            lamport_timestamp=ts
                         )
                         return False
                 else:
                     # Max retries reached
                     self.logger.error(
                         f"Falha ao comunicar com servidor após {max_retries} tentativas: {error_code.name}",
-                        lamport_timestamp=self.clock.get_time()
+                        lamport_timestamp=ts
                     )
                     return False
             
             except Exception as e:
                 retry_count += 1
-                self.clock.tick()
+                ts = self.clock.tick()
                 self.logger.error(
                     f"Erro inesperado ao imprimir: {type(e).__name__}: {str(e)}",
-                    lamport_timestamp=self.clock.get_time()
+                    lamport_timestamp=ts
                 )
                 if retry_count >= max_retries:
                     return False
-                time.sleep(1)  # Brief wait before retry
+                if self._shutdown_event.wait(timeout=1):  # Brief wait before retry
+                    return False
         
         return False  # Failed after all retries
     
@@ -659,6 +830,7 @@ class ClientNode:
         Args:
             message_content: Content to print
         """
+        granted = False
         try:
             # Step 1: Request access
             self.logger.info(
@@ -666,10 +838,10 @@ class ClientNode:
                 lamport_timestamp=self.clock.get_time()
             )
             
-            self.request_print_access()
+            granted = self.request_print_access()
             
             # Step 2: Print document (only if we have access)
-            if self.has_access:
+            if granted:
                 success = self.print_document(message_content)
                 
                 if success:
@@ -688,49 +860,39 @@ class ClientNode:
                     lamport_timestamp=self.clock.get_time()
                 )
             
-            # Step 3: Release access (always release, even if print failed)
-            self.release_access()
-            
         except Exception as e:
             self.logger.error(
                 f"Erro no workflow de impressão: {type(e).__name__}: {str(e)}",
                 lamport_timestamp=self.clock.get_time()
             )
-            # Always try to release access if we had it
-            with self.lock:
-                if self.has_access:
-                    self.release_access()
+        
+        finally:
+            # Step 3: Release access (exactly once, even if print failed)
+            if granted:
+                self.release_access()
     
     def _automatic_job_generator(self):
         """
         Generate print jobs automatically at random intervals.
         
         This thread runs continuously, generating print jobs based on
-        the configured interval range.
+        the configured interval range. Jobs run one at a time in this thread:
+        a node has at most one outstanding request, and the interval starts
+        counting after the previous job finishes.
         """
         while self.running:
             # Wait for random interval before generating next job
             interval = random.uniform(self.job_interval_min, self.job_interval_max)
             
-            # Wait in smaller chunks to allow for graceful shutdown
-            waited = 0.0
-            while waited < interval and self.running:
-                time.sleep(min(0.5, interval - waited))
-                waited += 0.5
-            
-            if not self.running:
+            # Wait for the interval, waking immediately on stop()
+            if self._shutdown_event.wait(timeout=interval) or not self.running:
                 break
             
             # Generate unique job message
             self.job_counter += 1
             message_content = f"Documento #{self.job_counter} do cliente {self.client_id}"
             
-            # Execute print job in a separate thread to avoid blocking
-            threading.Thread(
-                target=self.execute_print_job,
-                args=(message_content,),
-                daemon=True
-            ).start()
+            self.execute_print_job(message_content)
 
 
 def parse_peer_addresses(peers_str: str) -> List[str]:
@@ -750,6 +912,10 @@ def parse_peer_addresses(peers_str: str) -> List[str]:
 
 def main():
     """Main entry point for the client."""
+    # Imported here so that importing this module (e.g. from tests) does not
+    # pay for argparse
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description='Cliente Inteligente - Sistema de Impressão Distribuída',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -801,6 +967,13 @@ Exemplo de uso:
         help='Intervalo máximo entre jobs de impressão em segundos (padrão: 10.0)'
     )
     
+    parser.add_argument(
+        '--log-level',
+        choices=list(LEVEL_NAMES),
+        default='DEBUG',
+        help='Nível mínimo de log (padrão: DEBUG)'
+    )
+    
     args = parser.parse_args()
     
     # Validate interval arguments
@@ -812,6 +985,9 @@ Exemplo de uso:
         print("Erro: job-interval-min deve ser menor ou igual a job-interval-max")
         return
     
+    # Keep log writes off the RPC and critical-section threads
+    enable_async_output()
+    
     # Parse peer addresses
     peer_addresses = parse_peer_addresses(args.clients)
     
@@ -823,6 +999,7 @@ Exemplo de uso:
         peer_addresses=peer_addresses,
         job_interval_min=args.job_interval_min,
         job_interval_max=args.job_interval_max,
+        log_level=LEVEL_NAMES[args.log_level],
     )
     
     try:
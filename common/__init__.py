@@ -5,17 +5,48 @@ Exports:
 - LamportClock: Logical clock implementation
 - Logger: Standardized logging utilities
 - MessageBuilder: gRPC message construction helpers
+- CHANNEL_OPTIONS / SERVER_OPTIONS: gRPC keepalive settings for long-lived connections
+
+Importing this package selects protobuf's upb (C) backend unless
+PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION is already set, so it must be imported
+before printing_pb2.
 """
 
+import os
+
+# Must run before the first protobuf import (printing_pb2 via MessageBuilder)
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "upb")
+
+from common.grpc_options import CHANNEL_OPTIONS, SERVER_OPTIONS
 from common.lamport_clock import LamportClock
-from common.logger import Logger, create_client_logger, create_server_logger
+from common.logger import (
+    DEBUG,
+    ERROR,
+    INFO,
+    LAMPORT_CTX,
+    LEVEL_NAMES,
+    WARNING,
+    Logger,
+    create_client_logger,
+    create_server_logger,
+    enable_async_output,
+)
 from common.message_builder import MessageBuilder
 
 __all__ = [
     "LamportClock",
     "Logger",
+    "DEBUG",
+    "INFO",
+    "WARNING",
+    "ERROR",
+    "LAMPORT_CTX",
+    "LEVEL_NAMES",
     "create_client_logger",
     "create_server_logger",
+    "enable_async_output",
     "MessageBuilder",
+    "CHANNEL_OPTIONS",
+    "SERVER_OPTIONS",
 ]
 
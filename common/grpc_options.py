@@ -0,0 +1,24 @@
+"""
+gRPC Connection Options
+
+Shared channel and server options for the long-lived connections between
+clients, peers and the printer server.
+"""
+
+# Client-side options: keep idle HTTP/2 connections alive instead of letting
+# them be torn down and re-established between critical-section requests
+CHANNEL_OPTIONS = [
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.keepalive_timeout_ms', 10000),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.http2.min_time_between_pings_ms', 10000),
+]
+
+# Server-side options: accept the keepalive pings sent by CHANNEL_OPTIONS
+# (the defaults answer idle pings more often than every 5 minutes with GOAWAY)
+SERVER_OPTIONS = [
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.min_ping_interval_without_data_ms', 10000),
+    ('grpc.max_concurrent_streams', 1000),
+]
@@ -23,6 +23,8 @@ class LamportClock:
     another generating local events).
     """
 
+    __slots__ = ("_time", "_lock")
+
     def __init__(self, initial_time: int = 0):
         """
         Initialize Lamport clock.
@@ -52,7 +54,10 @@ class LamportClock:
         Returns:
             Timestamp to attach to outgoing message
         """
-        return self.tick()
+        # Same body as tick(), inlined to save a call on every send
+        with self._lock:
+            self._time += 1
+            return self._time
 
     def receive_event(self, received_timestamp: int) -> int:
         """
@@ -70,18 +75,25 @@ class LamportClock:
             New local timestamp after merge
         """
         with self._lock:
-            self._time = max(self._time, received_timestamp) + 1
-            return self._time
+            # Plain comparison instead of max(): avoids a builtin call per receive
+            new_time = self._time
+            if received_timestamp > new_time:
+                new_time = received_timestamp
+            new_time += 1
+            self._time = new_time
+            return new_time
 
     def get_time(self) -> int:
         """
         Get current timestamp without incrementing.
         
+        Lock-free: the value is a single int that writers replace under the
+        lock, so a reader always sees either the old or the new timestamp.
+        
         Returns:
             Current timestamp
         """
-        with self._lock:
-            return self._time
+        return self._time
 
     def update(self, new_time: int) -> int:
         """
@@ -5,10 +5,37 @@ Provides standardized logging format for the distributed printing system.
 Format: [TS: {timestamp}] CLIENTE {id}: {message}
 """
 
+import atexit
+import contextvars
+import os
+import queue
 import sys
-from datetime import datetime
+import threading
+import time
 from typing import Optional
 
+from common.lamport_clock import LamportClock
+
+
+# Log levels (same numeric values as the standard logging module)
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+# Level names accepted on the command line (--log-level)
+LEVEL_NAMES = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR}
+
+# Lamport timestamp of the event being handled in the current context (e.g., an
+# incoming RPC). Log calls without an explicit timestamp use it
+LAMPORT_CTX: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "lamport_timestamp", default=None
+)
+
+# Queue drained by the background writer once enable_async_output() is called
+_async_queue: Optional[queue.SimpleQueue] = None
+_async_thread: Optional[threading.Thread] = None
+
 
 class Logger:
     """
@@ -21,14 +48,43 @@ class Logger:
     Format: [TS: {timestamp}] SERVIDOR: {message}
     """
 
-    def __init__(self, client_id: Optional[int] = None):
+    def __init__(
+        self,
+        client_id: Optional[int] = None,
+        level: int = DEBUG,
+        lamport_clock: Optional[LamportClock] = None,
+    ):
         """
         Initialize logger.
         
         Args:
             client_id: Client ID for client loggers, None for server logger
+            level: Minimum level emitted by info/warning/error/debug (default: DEBUG)
+            lamport_clock: Clock used for lines logged without a timestamp
         """
         self.client_id = client_id
+        self.level = level
+        self.lamport_clock = lamport_clock
+        
+        # Constant part of every line after the timestamp, built once
+        if client_id is not None:
+            self._prefix = f"] CLIENTE {client_id}: "
+        else:
+            self._prefix = "] SERVIDOR: "
+
+    def is_enabled_for(self, level: int) -> bool:
+        """
+        Check whether messages at the given level would be emitted.
+        
+        Lets callers skip building expensive messages that would be dropped.
+        
+        Args:
+            level: Log level to check (DEBUG, INFO, WARNING or ERROR)
+            
+        Returns:
+            True if messages at this level are emitted
+        """
+        return level >= self.level
 
     def _format_message(self, message: str, lamport_timestamp: Optional[int] = None) -> str:
         """
@@ -36,21 +92,40 @@ class Logger:
         
         Args:
             message: Message content
-            lamport_timestamp: Lamport logical timestamp (if None, uses system time)
+            lamport_timestamp: Lamport logical timestamp (if None, uses LAMPORT_CTX,
+                then the logger's clock, then monotonic time in ms)
             
         Returns:
             Formatted message string
         """
-        if lamport_timestamp is not None:
-            timestamp = lamport_timestamp
-        else:
-            # Fallback to system time if no Lamport timestamp provided
-            timestamp = int(datetime.now().timestamp() * 1000)
+        if lamport_timestamp is None:
+            lamport_timestamp = LAMPORT_CTX.get()
 
-        if self.client_id is not None:
-            return f"[TS: {timestamp}] CLIENTE {self.client_id}: {message}"
-        else:
-            return f"[TS: {timestamp}] SERVIDOR: {message}"
+        if lamport_timestamp is None:
+            if self.lamport_clock is not None:
+                lamport_timestamp = self.lamport_clock.get_time()
+            else:
+                # No clock wired: monotonic time (ms) is cheap and never goes back
+                lamport_timestamp = time.monotonic_ns() // 1_000_000
+
+        return f"[TS: {lamport_timestamp}{self._prefix}{message}"
+
+    @staticmethod
+    def _write(formatted: str):
+        """
+        Write one formatted line to stdout and flush it.
+        
+        Args:
+            formatted: Formatted log line (without trailing newline)
+        """
+        log_queue = _async_queue
+        if log_queue is not None:
+            log_queue.put(formatted)
+            return
+
+        stream = sys.stdout
+        stream.write(formatted + "\n")
+        stream.flush()
 
     def log(self, message: str, lamport_timestamp: Optional[int] = None):
         """
@@ -60,24 +135,27 @@ class Logger:
             message: Message to log
             lamport_timestamp: Optional Lamport timestamp to include
         """
-        formatted = self._format_message(message, lamport_timestamp)
-        print(formatted, flush=True)
+        self._write(self._format_message(message, lamport_timestamp))
 
     def info(self, message: str, lamport_timestamp: Optional[int] = None):
         """Log info message."""
-        self.log(f"INFO: {message}", lamport_timestamp)
+        if INFO >= self.level:
+            self.log(f"INFO: {message}", lamport_timestamp)
 
     def error(self, message: str, lamport_timestamp: Optional[int] = None):
         """Log error message."""
-        self.log(f"ERROR: {message}", lamport_timestamp)
+        if ERROR >= self.level:
+            self.log(f"ERROR: {message}", lamport_timestamp)
 
     def warning(self, message: str, lamport_timestamp: Optional[int] = None):
         """Log warning message."""
-        self.log(f"WARNING: {message}", lamport_timestamp)
+        if WARNING >= self.level:
+            self.log(f"WARNING: {message}", lamport_timestamp)
 
     def debug(self, message: str, lamport_timestamp: Optional[int] = None):
         """Log debug message (can be disabled in production)."""
-        self.log(f"DEBUG: {message}", lamport_timestamp)
+        if DEBUG >= self.level:
+            self.log(f"DEBUG: {message}", lamport_timestamp)
 
     def print_request(self, message_content: str, lamport_timestamp: Optional[int] = None):
         """
@@ -87,29 +165,104 @@ class Logger:
             message_content: Content to print
             lamport_timestamp: Lamport timestamp from request
         """
-        formatted = self._format_message(message_content, lamport_timestamp)
-        print(formatted, flush=True)
+        self._write(self._format_message(message_content, lamport_timestamp))
 
 
-def create_client_logger(client_id: int) -> Logger:
+def create_client_logger(
+    client_id: int,
+    lamport_clock: Optional[LamportClock] = None,
+    level: int = DEBUG,
+) -> Logger:
     """
     Factory function to create a client logger.
     
     Args:
         client_id: Client identifier
+        lamport_clock: Client's clock, used for lines logged without a timestamp
+        level: Minimum level emitted (default: DEBUG)
         
     Returns:
         Logger instance configured for the client
     """
-    return Logger(client_id=client_id)
+    return Logger(client_id=client_id, level=level, lamport_clock=lamport_clock)
 
 
-def create_server_logger() -> Logger:
+def create_server_logger(
+    lamport_clock: Optional[LamportClock] = None,
+    level: int = DEBUG,
+) -> Logger:
     """
     Factory function to create a server logger.
     
+    Args:
+        lamport_clock: Server's clock, used for lines logged without a timestamp
+        level: Minimum level emitted (default: DEBUG)
+        
     Returns:
         Logger instance configured for the server
     """
-    return Logger(client_id=None)
+    return Logger(client_id=None, level=level, lamport_clock=lamport_clock)
+
+
+def enable_async_output():
+    """
+    Move log output off the calling threads.
+    
+    After this call, log lines are queued and a background thread writes them
+    to stdout (fd 1) in batches, so gRPC handlers and the critical section
+    never block on a write syscall. Pending lines are flushed at exit.
+    Meant for the CLI entry points; without it output stays synchronous.
+    """
+    global _async_queue, _async_thread
+    if _async_queue is not None:
+        return
+
+    sys.stdout.flush()
+    _async_queue = queue.SimpleQueue()
+    _async_thread = threading.Thread(
+        target=_drain_log_queue,
+        args=(_async_queue,),
+        name="log-writer",
+        daemon=True,
+    )
+    _async_thread.start()
+    atexit.register(_flush_async_output)
+
+
+def _drain_log_queue(log_queue: queue.SimpleQueue):
+    """
+    Write queued log lines to fd 1 until a None sentinel is received.
+    
+    Args:
+        log_queue: Queue of formatted log lines
+    """
+    while True:
+        batch = []
+        stop = False
+        line = log_queue.get()
+        while True:
+            if line is None:
+                stop = True
+                break
+            batch.append(line)
+            try:
+                line = log_queue.get_nowait()
+            except queue.Empty:
+                break
+
+        if batch:
+            data = ("\n".join(batch) + "\n").encode("utf-8", "replace")
+            while data:
+                written = os.write(1, data)
+                data = data[written:]
+
+        if stop:
+            return
+
 
+def _flush_async_output():
+    """Stop the background writer after it has written every queued line."""
+    if _async_queue is None or _async_thread is None:
+        return
+    _async_queue.put(None)
+    _async_thread.join(timeout=5)
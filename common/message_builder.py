@@ -7,6 +7,18 @@ Utilities for converting between gRPC messages and internal data structures.
 from typing import Optional
 import printing_pb2
 
+# Message classes bound once at import so the builders skip the module
+# attribute lookup on every call
+_PrintRequest = printing_pb2.PrintRequest
+_PrintResponse = printing_pb2.PrintResponse
+_AccessRequest = printing_pb2.AccessRequest
+_AccessResponse = printing_pb2.AccessResponse
+_AccessRelease = printing_pb2.AccessRelease
+_Empty = printing_pb2.Empty
+
+# Empty has no fields, so one shared instance serves every acknowledgement
+_EMPTY = _Empty()
+
 
 class MessageBuilder:
     """
@@ -32,7 +44,7 @@ class MessageBuilder:
         Returns:
             PrintRequest protobuf message
         """
-        return printing_pb2.PrintRequest(
+        return _PrintRequest(
             client_id=client_id,
             message_content=message_content,
             lamport_timestamp=lamport_timestamp,
@@ -56,7 +68,7 @@ class MessageBuilder:
         Returns:
             PrintResponse protobuf message
         """
-        return printing_pb2.PrintResponse(
+        return _PrintResponse(
             success=success,
             confirmation_message=confirmation_message,
             lamport_timestamp=lamport_timestamp,
@@ -79,7 +91,7 @@ class MessageBuilder:
         Returns:
             AccessRequest protobuf message
         """
-        return printing_pb2.AccessRequest(
+        return _AccessRequest(
             client_id=client_id,
             lamport_timestamp=lamport_timestamp,
             request_number=request_number,
@@ -100,7 +112,7 @@ class MessageBuilder:
         Returns:
             AccessResponse protobuf message
         """
-        return printing_pb2.AccessResponse(
+        return _AccessResponse(
             access_granted=access_granted,
             lamport_timestamp=lamport_timestamp,
         )
@@ -122,7 +134,7 @@ class MessageBuilder:
         Returns:
             AccessRelease protobuf message
         """
-        return printing_pb2.AccessRelease(
+        return _AccessRelease(
             client_id=client_id,
             lamport_timestamp=lamport_timestamp,
             request_number=request_number,
@@ -134,7 +146,7 @@ class MessageBuilder:
         Build Empty message.
         
         Returns:
-            Empty protobuf message
+            Shared Empty protobuf message (must not be mutated)
         """
-        return printing_pb2.Empty()
+        return _EMPTY
 
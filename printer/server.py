@@ -5,16 +5,22 @@ Simple gRPC server that receives print requests and prints them.
 Does NOT participate in mutual exclusion algorithm.
 """
 
-import argparse
+import os
 import time
 import random
+import threading
 import grpc
 from concurrent import futures
+# common is imported before printing_pb2 so it can select the protobuf backend
+from common.grpc_options import SERVER_OPTIONS
+from common.logger import DEBUG, LEVEL_NAMES, create_server_logger, enable_async_output
+from common.lamport_clock import LamportClock
+from google.protobuf.internal import api_implementation
 import printing_pb2
 import printing_pb2_grpc
-from common.logger import create_server_logger
-from common.message_builder import MessageBuilder
-from common.lamport_clock import LamportClock
+
+# Print responses are built inline on the request path
+_PrintResponse = printing_pb2.PrintResponse
 
 
 class PrintingServiceServicer(printing_pb2_grpc.PrintingServiceServicer):
@@ -25,21 +31,31 @@ class PrintingServiceServicer(printing_pb2_grpc.PrintingServiceServicer):
     It does NOT participate in mutual exclusion.
     """
 
-    def __init__(self, print_delay_min: float = 2.0, print_delay_max: float = 3.0):
+    def __init__(
+        self,
+        print_delay_min: float = 2.0,
+        print_delay_max: float = 3.0,
+        log_level: int = DEBUG,
+    ):
         """
         Initialize the printing service.
         
         Args:
             print_delay_min: Minimum delay in seconds (default: 2.0)
             print_delay_max: Maximum delay in seconds (default: 3.0)
+            log_level: Minimum log level emitted (default: DEBUG)
         """
-        self.logger = create_server_logger()
         self.print_delay_min = print_delay_min
         self.print_delay_max = print_delay_max
         
         # Server maintains its own Lamport clock for responses
         # It updates based on received timestamps
         self.clock = LamportClock()
+        self.logger = create_server_logger(self.clock, log_level)
+        
+        # Per-thread generators for the simulated delay, so concurrent
+        # handlers do not share the module-level random state
+        self._rng = threading.local()
 
     def SendToPrinter(self, request: printing_pb2.PrintRequest, context):
         """
@@ -63,18 +79,25 @@ class PrintingServiceServicer(printing_pb2_grpc.PrintingServiceServicer):
         
         # Log the print request in the specified format
         # Format: [TS: {timestamp}] CLIENTE {id}: {mensagem}
-        # We need to print as if coming from the client, not the server
-        print(f"[TS: {request.lamport_timestamp}] CLIENTE {request.client_id}: {request.message_content}", flush=True)
+        # We need to print as if coming from the client, not the server.
+        # A single unbuffered write keeps concurrent lines whole
+        os.write(1, b"[TS: %d] CLIENTE %d: %s\n" % (
+            request.lamport_timestamp,
+            request.client_id,
+            request.message_content.encode("utf-8", "replace"),
+        ))
         
         # Simulate printing delay (2-3 seconds)
-        delay = random.uniform(self.print_delay_min, self.print_delay_max)
-        time.sleep(delay)
+        rng = getattr(self._rng, 'r', None)
+        if rng is None:
+            rng = self._rng.r = random.Random()
+        time.sleep(rng.uniform(self.print_delay_min, self.print_delay_max))
         
         # Increment clock for the response
         response_timestamp = self.clock.tick()
         
         # Create and return confirmation response
-        response = MessageBuilder.build_print_response(
+        response = _PrintResponse(
             success=True,
             confirmation_message=f"Documento do cliente {request.client_id} impresso com sucesso",
             lamport_timestamp=response_timestamp,
@@ -88,7 +111,12 @@ class PrintingServiceServicer(printing_pb2_grpc.PrintingServiceServicer):
         return response
 
 
-def serve(port: int = 50051, print_delay_min: float = 2.0, print_delay_max: float = 3.0):
+def serve(
+    port: int = 50051,
+    print_delay_min: float = 2.0,
+    print_delay_max: float = 3.0,
+    log_level: int = DEBUG,
+):
     """
     Start the gRPC server.
     
@@ -96,14 +124,14 @@ def serve(port: int = 50051, print_delay_min: float = 2.0, print_delay_max: floa
         port: Port to listen on (default: 50051)
         print_delay_min: Minimum print delay in seconds (default: 2.0)
         print_delay_max: Maximum print delay in seconds (default: 3.0)
+        log_level: Minimum log level emitted (default: DEBUG)
     """
-    logger = create_server_logger()
-    
     # Create gRPC server
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10), options=SERVER_OPTIONS)
     
-    # Add servicer
-    printing_servicer = PrintingServiceServicer(print_delay_min, print_delay_max)
+    # Add servicer (its logger is stamped with the server's Lamport clock)
+    printing_servicer = PrintingServiceServicer(print_delay_min, print_delay_max, log_level)
+    logger = printing_servicer.logger
     printing_pb2_grpc.add_PrintingServiceServicer_to_server(printing_servicer, server)
     
     # Listen on port
@@ -114,6 +142,7 @@ def serve(port: int = 50051, print_delay_min: float = 2.0, print_delay_max: floa
     server.start()
     logger.info(f"Servidor de impressão iniciado na porta {port}")
     logger.info(f"Delay de impressão: {print_delay_min}-{print_delay_max} segundos")
+    logger.info(f"Backend protobuf: {api_implementation.Type()}")
     
     try:
         server.wait_for_termination()
@@ -124,6 +153,9 @@ def serve(port: int = 50051, print_delay_min: float = 2.0, print_delay_max: floa
 
 def main():
     """Main entry point for the printer server."""
+    # Imported here so that importing this module does not pay for argparse
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description='Servidor de Impressão Distribuída (Burro)',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -154,6 +186,13 @@ Exemplo de uso:
         help='Delay máximo de impressão em segundos (padrão: 3.0)'
     )
     
+    parser.add_argument(
+        '--log-level',
+        choices=list(LEVEL_NAMES),
+        default='DEBUG',
+        help='Nível mínimo de log (padrão: DEBUG)'
+    )
+    
     args = parser.parse_args()
     
     # Validate delay arguments
@@ -165,7 +204,15 @@ Exemplo de uso:
         print("Erro: delay-min deve ser menor ou igual a delay-max")
         return
     
-    serve(port=args.port, print_delay_min=args.delay_min, print_delay_max=args.delay_max)
+    # Keep log writes off the RPC threads
+    enable_async_output()
+    
+    serve(
+        port=args.port,
+        print_delay_min=args.delay_min,
+        print_delay_max=args.delay_max,
+        log_level=LEVEL_NAMES[args.log_level],
+    )
 
 
 if __name__ == '__main__':
@@ -1,7 +1,7 @@
 #!/bin/bash
 
 # Script to run a client for manual testing
-# Usage: ./scripts/run_client.sh --id ID --port PORT --server SERVER [--clients CLIENTS] [--job-interval-min MIN] [--job-interval-max MAX]
+# Usage: ./scripts/run_client.sh --id ID --port PORT --server SERVER [--clients CLIENTS] [--job-interval-min MIN] [--job-interval-max MAX] [--log-level LEVEL]
 
 set -e
 
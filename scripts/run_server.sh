@@ -1,7 +1,7 @@
 #!/bin/bash
 
 # Script to run printer server for manual testing
-# Usage: ./scripts/run_server.sh [--port PORT] [--delay-min MIN] [--delay-max MAX]
+# Usage: ./scripts/run_server.sh [--port PORT] [--delay-min MIN] [--delay-max MAX] [--log-level LEVEL]
 
 set -e
 
@@ -14,6 +14,7 @@ cd "$PROJECT_ROOT"
 PORT=50051
 DELAY_MIN=2.0
 DELAY_MAX=3.0
+LOG_LEVEL=DEBUG
 
 # Parse arguments
 while [[ $# -gt 0 ]]; do
@@ -30,9 +31,13 @@ while [[ $# -gt 0 ]]; do
             DELAY_MAX="$2"
             shift 2
             ;;
+        --log-level)
+            LOG_LEVEL="$2"
+            shift 2
+            ;;
         *)
             echo "Unknown option: $1"
-            echo "Usage: $0 [--port PORT] [--delay-min MIN] [--delay-max MAX]"
+            echo "Usage: $0 [--port PORT] [--delay-min MIN] [--delay-max MAX] [--log-level LEVEL]"
             exit 1
             ;;
     esac
@@ -59,5 +64,6 @@ echo ""
 PYTHONPATH="$PROJECT_ROOT" python3 printer/server.py \
     --port "$PORT" \
     --delay-min "$DELAY_MIN" \
-    --delay-max "$DELAY_MAX"
+    --delay-max "$DELAY_MAX" \
+    --log-level "$LOG_LEVEL"
 
@@ -4,17 +4,28 @@ Integration tests for Ricart-Agrawala algorithm.
 Tests the full flow with in-process gRPC servers and clients.
 """
 
+import heapq
 import pytest
 import threading
 import time
 from concurrent import futures
 import grpc
-from client.main import ClientNode
+from client.main import ClientNode, PendingRequest
 from printer.server import PrintingServiceServicer
 import printing_pb2_grpc
 import printing_pb2
 
 
+def _wait_until(predicate, timeout=5.0):
+    """Poll predicate until it holds or the deadline passes."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
 class TestRicartAgrawalaIntegration:
     """Integration tests for Ricart-Agrawala mutual exclusion."""
 
@@ -80,8 +91,8 @@ class TestRicartAgrawalaIntegration:
         thread2 = threading.Thread(target=client2.request_print_access, daemon=True)
         thread2.start()
 
-        # Give time for client2 to issue request and be deferred
-        time.sleep(0.5)
+        # Wait until client1 has deferred client2's request
+        assert _wait_until(lambda: 2 in client1.deferred_replies)
         assert thread2.is_alive()
         assert client2.waiting_for_access
         assert not client2.has_access
@@ -119,12 +130,8 @@ class TestRicartAgrawalaIntegration:
         
         # Set up clients so client1 is waiting
         client1.request_number = 1
-        pending = type('PendingRequest', (), {
-            'client_id': 1,
-            'lamport_timestamp': 10,
-            'request_number': 1
-        })()
-        client1.request_queue.append(pending)
+        pending = PendingRequest(lamport_timestamp=10, client_id=1, request_number=1)
+        heapq.heappush(client1.request_queue, pending)
         client1.waiting_for_access = True
         
         # Create a request with lower timestamp
@@ -142,7 +149,7 @@ class TestRicartAgrawalaIntegration:
         
         # Create a request with higher timestamp
         client1.request_queue.clear()
-        client1.request_queue.append(pending)
+        heapq.heappush(client1.request_queue, pending)
         request_higher = printing_pb2.AccessRequest(
             client_id=2,
             lamport_timestamp=15,  # Higher than 10
@@ -155,9 +162,8 @@ class TestRicartAgrawalaIntegration:
         req_thread = threading.Thread(target=_call_request, daemon=True)
         req_thread.start()
 
-        time.sleep(0.5)
+        assert _wait_until(lambda: client1.deferred_replies)
         assert req_thread.is_alive()
-        assert len(client1.deferred_replies) > 0
 
         # Simulate entering and leaving critical section to unblock deferred request
         with client1.lock:
@@ -213,7 +219,8 @@ class TestRicartAgrawalaIntegration:
         for t in threads:
             t.start()
         
-        time.sleep(1)
+        for t in threads:
+            t.join(timeout=5)
         
         # Should have only one request in queue (others should be handled)
         assert len(client.request_queue) <= 3
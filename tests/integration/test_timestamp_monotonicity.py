@@ -32,25 +32,27 @@ class TestTimestampMonotonicity:
     def test_lamport_clock_thread_safety_monotonicity(self):
         """Test monotonicity under concurrent access."""
         clock = LamportClock()
-        timestamps = []
-        lock = threading.Lock()
+        # One list per thread, so only the clock is contended
+        per_thread = [[] for _ in range(5)]
         
-        def increment_clock():
+        def increment_clock(local_list):
             for _ in range(10):
-                ts = clock.tick()
-                with lock:
-                    timestamps.append(ts)
+                local_list.append(clock.tick())
         
-        threads = [threading.Thread(target=increment_clock) for _ in range(5)]
+        threads = [threading.Thread(target=increment_clock, args=(lst,)) for lst in per_thread]
         for t in threads:
             t.start()
         for t in threads:
             t.join()
         
-        # Verify monotonicity
-        sorted_timestamps = sorted(timestamps)
-        assert timestamps == sorted_timestamps, \
-            "Timestamps not monotonic under concurrent access"
+        # Verify monotonicity within each thread
+        for local_list in per_thread:
+            assert all(a < b for a, b in zip(local_list, local_list[1:])), \
+                "Timestamps not monotonic under concurrent access"
+        
+        # Every tick produced a distinct timestamp
+        timestamps = [ts for local_list in per_thread for ts in local_list]
+        assert sorted(timestamps) == list(range(1, 51))
 
     def test_client_timestamps_monotonicity(self):
         """Test that client operations maintain timestamp monotonicity."""
@@ -5,9 +5,24 @@ Unit tests for Client Node Architecture.
 import pytest
 import time
 import threading
+import grpc
 from unittest.mock import Mock, patch, MagicMock
-from client.main import ClientNode, parse_peer_addresses, MutualExclusionServiceServicer
+from client.main import (
+    ACCESS_REPLY_TIMEOUT,
+    DEFER_HIGHER_TIMESTAMP,
+    DEFER_IN_CS,
+    GRANT_IDLE,
+    GRANT_TIE_LOWER_ID,
+    ClientNode,
+    PendingRequest,
+    get_channel,
+    parse_peer_addresses,
+    release_channel,
+    MutualExclusionServiceServicer,
+)
 import printing_pb2
+from common.grpc_options import CHANNEL_OPTIONS
+from common.logger import DEBUG, INFO, WARNING
 
 
 class TestClientNode:
@@ -30,6 +45,10 @@ class TestClientNode:
         assert client.request_number == 0
         assert len(client.request_queue) == 0
         assert len(client.outstanding_replies) == 0
+        assert client.logger.level == DEBUG
+        
+        quiet = ClientNode(1, 50052, 'localhost:50051', [], log_level=WARNING)
+        assert not quiet.logger.is_enabled_for(INFO)
         assert client.has_access is False
 
     def test_parse_peer_addresses(self):
@@ -62,6 +81,47 @@ class TestClientNode:
         assert len(client.request_queue) == 1
         assert client.request_queue[0].client_id == 1
 
+    def test_request_queue_head_is_oldest(self):
+        """Test that the request queue keeps the oldest request at its head."""
+        client = ClientNode(
+            client_id=1,
+            port=50052,
+            printer_server='localhost:50051',
+            peer_addresses=[]
+        )
+        
+        client.request_print_access()
+        client.request_print_access()
+        
+        assert len(client.request_queue) == 2
+        assert client.request_queue[0] == min(client.request_queue)
+        assert PendingRequest(1, 2, 1) < PendingRequest(1, 3, 1) < PendingRequest(2, 1, 1)
+
+    def test_evaluate_access_request(self):
+        """Test the defer/grant decision and its reason code."""
+        client = ClientNode(
+            client_id=2,
+            port=50052,
+            printer_server='localhost:50051',
+            peer_addresses=[]
+        )
+        request = printing_pb2.AccessRequest(client_id=1, lamport_timestamp=10, request_number=1)
+        
+        # Idle node grants immediately
+        assert client._evaluate_access_request(request)[:2] == (False, GRANT_IDLE)
+        
+        # Waiting with an older request defers; equal timestamps fall back to IDs
+        client.request_queue.append(PendingRequest(5, 2, 1))
+        client.waiting_for_access = True
+        assert client._evaluate_access_request(request)[:2] == (True, DEFER_HIGHER_TIMESTAMP)
+        client.request_queue[0] = PendingRequest(10, 2, 1)
+        assert client._evaluate_access_request(request)[:2] == (False, GRANT_TIE_LOWER_ID)
+        
+        # In critical section always defers
+        client.has_access = True
+        should_defer, reason, reason_args = client._evaluate_access_request(request)
+        assert (should_defer, reason, reason_args) == (True, DEFER_IN_CS, (1, 10))
+
     def test_clock_updates_on_request(self):
         """Test that clock updates when requesting access."""
         client = ClientNode(
@@ -77,6 +137,78 @@ class TestClientNode:
         # Clock should have incremented
         assert client.clock.get_time() > initial_time
 
+    def test_request_print_access_returns_granted(self):
+        """Test that request_print_access reports the granted access."""
+        client = ClientNode(
+            client_id=1,
+            port=50052,
+            printer_server='localhost:50051',
+            peer_addresses=[]
+        )
+        
+        assert client.request_print_access() is True
+        assert client.has_access is True
+
+    def test_request_print_access_fails_on_peer_error(self):
+        """Test that a failed peer reply withdraws the request instead of granting."""
+        client = ClientNode(
+            client_id=1,
+            port=50052,
+            printer_server='localhost:50051',
+            peer_addresses=['localhost:50053']
+        )
+        
+        class _Unavailable(grpc.RpcError):
+            def code(self):
+                return grpc.StatusCode.UNAVAILABLE
+        
+        request_access = Mock()
+        request_access.future.return_value.result.side_effect = _Unavailable()
+        client._peer_request_access = (('localhost:50053', request_access),)
+        client.deferred_replies[3] = printing_pb2.AccessRequest(client_id=3)
+        
+        assert client.request_print_access() is False
+        assert client.has_access is False
+        assert client.waiting_for_access is False
+        assert client.request_queue == []
+        assert client.deferred_replies == {}
+
+    def test_execute_print_job_releases_once_on_error(self):
+        """Test that a failing print job still releases access exactly once."""
+        client = ClientNode(
+            client_id=1,
+            port=50052,
+            printer_server='localhost:50051',
+            peer_addresses=[]
+        )
+        
+        with patch.object(client, 'print_document', side_effect=RuntimeError("boom")), \
+             patch.object(client, 'release_access', wraps=client.release_access) as mock_release:
+            client.execute_print_job("Test")
+        
+        mock_release.assert_called_once()
+        assert client.has_access is False
+
+    def test_release_access_after_stop(self):
+        """Test that releasing after stop() skips the fan-out instead of raising."""
+        client = ClientNode(
+            client_id=1,
+            port=50052,
+            printer_server='localhost:50051',
+            peer_addresses=['localhost:50053']
+        )
+        stub = Mock()
+        client._peer_stub_pairs = (('localhost:50053', stub),)
+        client.has_access = True
+        
+        client.stop()
+        client.release_access()
+        
+        assert client.has_access is False
+        stub.ReleaseAccess.assert_not_called()
+
+    @patch.dict('client.main._CHANNEL_CACHE', clear=True)
+    @patch.dict('client.main._CHANNEL_REFCOUNTS', clear=True)
     @patch('grpc.insecure_channel')
     @patch('grpc.server')
     def test_initialize_grpc(self, mock_server, mock_channel):
@@ -100,6 +232,43 @@ class TestClientNode:
         assert client.grpc_server is not None
         assert client.printer_stub is not None
         assert len(client.peer_stubs) == 1
+        assert client._executor is not None
+        mock_channel.assert_any_call('localhost:50053', options=CHANNEL_OPTIONS)
+        
+        client.stop()
+
+    @patch.dict('client.main._CHANNEL_CACHE', clear=True)
+    @patch.dict('client.main._CHANNEL_REFCOUNTS', clear=True)
+    @patch('grpc.insecure_channel')
+    @patch('grpc.server')
+    def test_broadcast_sends_serialized_request(self, mock_server, mock_channel):
+        """Test that the AccessRequest is serialized once and sent to every peer."""
+        # One mock channel per address, so each peer gets its own callable
+        mock_channel.side_effect = lambda address, options: MagicMock()
+        client = ClientNode(
+            client_id=1,
+            port=50052,
+            printer_server='localhost:50051',
+            peer_addresses=['localhost:50053', 'localhost:50054']
+        )
+        client.initialize_grpc()
+        
+        replies = client._broadcast_access_request(PendingRequest(7, 1, 3))
+        
+        expected = printing_pb2.AccessRequest(
+            client_id=1, lamport_timestamp=7, request_number=3
+        ).SerializeToString()
+        assert [addr for addr, _ in replies] == ['localhost:50053', 'localhost:50054']
+        first, second = (call for _, call in client._peer_request_access)
+        assert first is not second
+        for request_access in (first, second):
+            request_access.future.assert_called_once_with(
+                expected, timeout=ACCESS_REPLY_TIMEOUT, wait_for_ready=True
+            )
+        # Serialized once: both peers were sent the very same bytes object
+        assert first.future.call_args.args[0] is second.future.call_args.args[0]
+        
+        client.stop()
 
     def test_status_reporter_thread(self):
         """Test status reporter thread functionality."""
@@ -116,12 +285,79 @@ class TestClientNode:
             thread = threading.Thread(target=client._status_reporter, daemon=True)
             thread.start()
             time.sleep(0.1)  # Brief wait
-            client.running = False
+            client.stop()  # Wakes the loop's shutdown wait
             thread.join(timeout=1)
+            assert not thread.is_alive()
             
             # Status should have been logged
             assert mock_log.called or True  # May or may not be called depending on timing
 
+    def test_stop_wakes_background_threads(self):
+        """Test that stop() interrupts the background loops immediately."""
+        client = ClientNode(
+            client_id=1,
+            port=50052,
+            printer_server='localhost:50051',
+            peer_addresses=[],
+            job_interval_min=100.0,
+            job_interval_max=100.0
+        )
+        
+        client.running = True
+        threads = [
+            threading.Thread(target=client._status_reporter, daemon=True),
+            threading.Thread(target=client._automatic_job_generator, daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        
+        client.stop()
+        for thread in threads:
+            thread.join(timeout=1)
+            assert not thread.is_alive()
+
+    def test_stop_releases_deferred_request(self):
+        """Test that stop() unblocks a RequestAccess handler holding a deferred reply."""
+        client = ClientNode(
+            client_id=1,
+            port=50052,
+            printer_server='localhost:50051',
+            peer_addresses=[]
+        )
+        client.has_access = True
+        servicer = MutualExclusionServiceServicer(client)
+        request = printing_pb2.AccessRequest(client_id=2, lamport_timestamp=10, request_number=1)
+        
+        thread = threading.Thread(target=servicer.RequestAccess, args=(request, Mock()), daemon=True)
+        thread.start()
+        deadline = time.monotonic() + 5
+        while 2 not in client.deferred_replies and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert 2 in client.deferred_replies
+        
+        client.stop()
+        thread.join(timeout=1)
+        assert not thread.is_alive()
+
+    @patch.dict('client.main._CHANNEL_CACHE', clear=True)
+    @patch.dict('client.main._CHANNEL_REFCOUNTS', clear=True)
+    @patch('grpc.insecure_channel')
+    def test_get_channel_is_shared(self, mock_channel):
+        """Test that channels are created once per address and reused."""
+        mock_channel.side_effect = lambda address, options: MagicMock()
+        
+        first = get_channel('localhost:50053')
+        assert get_channel('localhost:50053') is first
+        assert get_channel('localhost:50054') is not first
+        assert mock_channel.call_count == 2
+        
+        # Closed only once every user has released it
+        release_channel('localhost:50053')
+        first.close.assert_not_called()
+        release_channel('localhost:50053')
+        first.close.assert_called_once()
+        assert get_channel('localhost:50053') is not first
+
 
 class TestMutualExclusionServiceServicer:
     """Test suite for MutualExclusionServiceServicer."""
@@ -3,7 +3,19 @@ Unit tests for Logger implementation.
 """
 
 import pytest
-from common.logger import Logger, create_client_logger, create_server_logger
+import queue
+from common.lamport_clock import LamportClock
+from common.logger import (
+    DEBUG,
+    ERROR,
+    INFO,
+    LAMPORT_CTX,
+    WARNING,
+    Logger,
+    _drain_log_queue,
+    create_client_logger,
+    create_server_logger,
+)
 
 
 class TestLogger:
@@ -42,6 +54,48 @@ class TestLogger:
         assert "ERROR:" in captured.out
         assert "DEBUG:" in captured.out
 
+    def test_level_filtering(self, capsys):
+        """Test that messages below the configured level are dropped."""
+        logger = Logger(client_id=1, level=WARNING)
+        
+        assert logger.is_enabled_for(WARNING)
+        assert not logger.is_enabled_for(INFO)
+        
+        logger.info("Info message", lamport_timestamp=1)
+        logger.debug("Debug message", lamport_timestamp=2)
+        logger.warning("Warning message", lamport_timestamp=3)
+        logger.error("Error message", lamport_timestamp=4)
+        
+        captured = capsys.readouterr()
+        assert "INFO:" not in captured.out
+        assert "DEBUG:" not in captured.out
+        assert "WARNING:" in captured.out
+        assert "ERROR:" in captured.out
+
+    def test_context_timestamp(self, capsys):
+        """Test that LAMPORT_CTX is used when no timestamp is passed."""
+        logger = Logger(client_id=1)
+        token = LAMPORT_CTX.set(77)
+        try:
+            logger.info("Context message")
+            logger.info("Explicit message", lamport_timestamp=78)
+        finally:
+            LAMPORT_CTX.reset(token)
+        
+        captured = capsys.readouterr()
+        assert "[TS: 77] CLIENTE 1: INFO: Context message" in captured.out
+        assert "[TS: 78] CLIENTE 1: INFO: Explicit message" in captured.out
+
+    def test_clock_fallback_timestamp(self, capsys):
+        """Test that the wired Lamport clock stamps lines without a timestamp."""
+        clock = LamportClock(initial_time=9)
+        logger = Logger(client_id=1, lamport_clock=clock)
+        
+        logger.info("Clock message")
+        
+        captured = capsys.readouterr()
+        assert "[TS: 9] CLIENTE 1: INFO: Clock message" in captured.out
+
     def test_print_request(self, capsys):
         """Test print_request method."""
         logger = Logger(client_id=1)
@@ -50,11 +104,30 @@ class TestLogger:
         assert "[TS: 100]" in captured.out
         assert "Print content" in captured.out
 
+    def test_async_output_drains_queue(self, capfd):
+        """Test that the background writer flushes queued lines up to the sentinel."""
+        log_queue = queue.SimpleQueue()
+        log_queue.put("[TS: 1] SERVIDOR: first")
+        log_queue.put("[TS: 2] SERVIDOR: second")
+        log_queue.put(None)
+        
+        _drain_log_queue(log_queue)
+        
+        captured = capfd.readouterr()
+        assert captured.out == "[TS: 1] SERVIDOR: first\n[TS: 2] SERVIDOR: second\n"
+
     def test_factory_functions(self):
         """Test factory functions."""
         client_logger = create_client_logger(5)
         assert client_logger.client_id == 5
+        assert client_logger.lamport_clock is None
+        
+        clock = LamportClock()
+        assert create_client_logger(5, clock).lamport_clock is clock
+        assert client_logger.level == DEBUG
+        assert create_client_logger(5, clock, WARNING).level == WARNING
 
         server_logger = create_server_logger()
         assert server_logger.client_id is None
+        assert create_server_logger(clock, ERROR).level == ERROR
 
@@ -75,3 +75,7 @@ class TestMessageBuilder:
         msg = MessageBuilder.build_empty()
         assert isinstance(msg, printing_pb2.Empty)
 
+
+    def test_build_empty_is_cached(self):
+        """Test Empty message is shared."""
+        assert MessageBuilder.build_empty() is MessageBuilder.build_empty()
@@ -102,7 +102,7 @@ class TestPrintingServiceServicer:
         assert elapsed >= 0.1
         assert response.success is True
 
-    def test_send_to_printer_logs_message(self, capsys):
+    def test_send_to_printer_logs_message(self, capfd):
         """Test that SendToPrinter logs messages correctly."""
         servicer = PrintingServiceServicer(print_delay_min=0.01, print_delay_max=0.02)
         
@@ -119,7 +119,7 @@ class TestPrintingServiceServicer:
         with patch('time.sleep'):  # Skip actual delay
             response = servicer.SendToPrinter(request, context)
         
-        captured = capsys.readouterr()
+        captured = capfd.readouterr()
         
         # Check that output contains expected format
         assert "[TS: 100]" in captured.out